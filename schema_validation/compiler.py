@@ -0,0 +1,309 @@
+"""
+Compilation of JSONSchema trees into specialized Python functions
+"""
+
+import math
+
+from . import validators as val
+from .utils import isnumeric
+
+
+class SchemaCompiler(object):
+    """Generate and compile Python source code for a JSONSchema object
+
+    Each JSONSchema reachable from the compiled schema becomes one generated
+    function ``s<N>(obj)``, which returns True if ``obj`` is valid and False
+    otherwise. Schema bounds and keys are written into the source as
+    literals, and child schemas are called by name, so recursive schemas
+    need no special treatment. Values which have no literal form (compiled
+    regexes, enum sets, ...) are passed in through the namespace of the
+    generated code as ``c<N>``.
+
+    Validators without a code generator (e.g. those defined outside this
+    package) are called through their ``matches`` method.
+
+    Parameters
+    ----------
+    schema : JSONSchema object
+        the schema to compile
+
+    Attributes
+    ----------
+    source : str
+        the generated source code (available after compile() is called)
+    """
+    def __init__(self, schema):
+        self.schema = schema
+        self.source = None
+        self._namespace = {}
+        self._names = {}
+        self._queue = []
+        self._lines = []
+        self._footer = []
+
+    def compile(self):
+        """Return the compiled function for the schema"""
+        name = self.function_name(self.schema)
+        while self._queue:
+            self._emit_function(self._queue.pop())
+        self.source = '\n'.join(self._lines + self._footer)
+        exec(compile(self.source, '<schema>', 'exec'), self._namespace)
+        return self._namespace[name]
+
+    def function_name(self, schema):
+        """Return the name of the generated function for a JSONSchema"""
+        key = id(schema)
+        if key not in self._names:
+            self._names[key] = 's{0}'.format(len(self._names))
+            self._queue.append(schema)
+        return self._names[key]
+
+    def function_table(self, schemas):
+        """Return the name of a dict mapping keys to generated functions
+
+        ``schemas`` is a dict mapping keys to JSONSchema objects. The dict of
+        functions is created after all functions have been defined.
+        """
+        name = self.constant(None)
+        items = ('{0!r}: {1}'.format(key, self.function_name(schema))
+                 for key, schema in schemas.items())
+        self._footer.append('{0} = {{{1}}}'.format(name, ', '.join(items)))
+        return name
+
+    def pattern_table(self, patterns):
+        """Return the name of a list of (regex, generated function) pairs
+
+        ``patterns`` is a list of (compiled regex, JSONSchema) pairs. Like
+        function_table, the list is created after all function definitions.
+        """
+        name = self.constant(None)
+        items = ('({0}, {1})'.format(self.constant(regex),
+                                     self.function_name(schema))
+                 for regex, schema in patterns)
+        self._footer.append('{0} = [{1}]'.format(name, ', '.join(items)))
+        return name
+
+    def constant(self, value):
+        """Return the name under which value is available to generated code"""
+        name = 'c{0}'.format(len(self._namespace))
+        self._namespace[name] = value
+        return name
+
+    def literal(self, value):
+        """Return source code for value, as a literal if it has one"""
+        if (value is None or isinstance(value, (bool, int, str))
+                or (isinstance(value, float) and math.isfinite(value))):
+            return repr(value)
+        return self.constant(value)
+
+    def call(self, schemas, join, empty):
+        """Return source for calling schemas' functions, joined by an operator
+
+        ``empty`` is the source used when there are no schemas.
+        """
+        calls = ['{0}(obj)'.format(self.function_name(schema))
+                 for schema in schemas]
+        return ' {0} '.format(join).join(calls) if calls else empty
+
+    def _emit_function(self, schema):
+        body = []
+        for validator in schema.validators.minimal():
+            emitter = _EMITTERS.get(type(validator), _emit_fallback)
+            body.extend(emitter(self, validator))
+        self._lines.append('def {0}(obj):'.format(self.function_name(schema)))
+        self._lines.extend('    ' + line for line in body)
+        self._lines.append('    return True')
+        self._lines.append('')
+
+
+def _fail_if(condition):
+    return ['if {0}:'.format(condition), '    return False']
+
+
+def _emit_fallback(compiler, validator):
+    return _fail_if('not {0}(obj)'.format(compiler.constant(validator.matches)))
+
+
+def _emit_object(compiler, validator):
+    if validator._properties is None:
+        validator._init_properties()
+    additional = validator._additional
+
+    lines = ['if isinstance(obj, dict):']
+    for key in sorted(validator._required):
+        lines.extend('    ' + line
+                     for line in _fail_if('{0!r} not in obj'.format(key)))
+    if validator._properties or validator._patterns or additional is not True:
+        table = compiler.function_table(validator._properties)
+        lines += ['    for key, val in obj.items():',
+                  '        func = {0}.get(key, None)'.format(table),
+                  '        if func is not None:',
+                  '            if not func(val):',
+                  '                return False']
+        if validator._patterns:
+            patterns = compiler.pattern_table(validator._patterns)
+            lines += ['        matched = func is not None',
+                      '        for regex, func in {0}:'.format(patterns),
+                      '            if regex.search(key) is not None:',
+                      '                matched = True',
+                      '                if not func(val):',
+                      '                    return False',
+                      '        if matched:',
+                      '            continue']
+        else:
+            lines += ['        if func is not None:',
+                      '            continue']
+        if not additional:
+            lines.append('        return False')
+        elif additional is not True:
+            name = compiler.function_name(additional)
+            lines += ['        if not {0}(val):'.format(name),
+                      '            return False']
+    lines.append('    pass')
+    if validator._is_object or validator._required:
+        lines += ['else:',
+                  '    return False']
+    return lines
+
+
+def _emit_array(compiler, validator):
+    lines = _fail_if('not isinstance(obj, list)')
+    if 'minItems' in validator.schema:
+        lines += _fail_if('len(obj) < {0}'.format(
+            compiler.literal(validator._min_items)))
+    if 'maxItems' in validator.schema:
+        lines += _fail_if('len(obj) > {0}'.format(
+            compiler.literal(validator._max_items)))
+    if validator._num_items is not None:
+        lines += _fail_if('len(obj) != {0}'.format(
+            compiler.literal(validator._num_items)))
+    if 'items' in validator.schema:
+        itemtype = validator._items or validator._init_items()
+        if itemtype.validators:
+            lines += ['for val in obj:',
+                      '    if not {0}(val):'.format(
+                          compiler.function_name(itemtype)),
+                      '        return False']
+    return lines
+
+
+_BOUNDS = [('minimum', '_minimum', '<'),
+           ('maximum', '_maximum', '>'),
+           ('exclusiveMinimum', '_exclusive_minimum', '<='),
+           ('exclusiveMaximum', '_exclusive_maximum', '>=')]
+
+
+def _emit_bounds(compiler, validator):
+    lines = []
+    for key, attr, op in _BOUNDS:
+        if key in validator.schema:
+            lines += _fail_if('obj {0} {1}'.format(
+                op, compiler.literal(getattr(validator, attr))))
+    return lines
+
+
+def _emit_number(compiler, validator):
+    lines = _fail_if('not {0}(obj)'.format(compiler.constant(isnumeric)))
+    return lines + _emit_bounds(compiler, validator)
+
+
+def _emit_integer(compiler, validator):
+    lines = _fail_if('not {0}(obj)'.format(compiler.constant(isnumeric)))
+    lines += _fail_if('int(obj) != obj')
+    return lines + _emit_bounds(compiler, validator)
+
+
+def _emit_string(compiler, validator):
+    lines = _fail_if('not isinstance(obj, str)')
+    if 'minLength' in validator.schema:
+        lines += _fail_if('len(obj) < {0}'.format(
+            compiler.literal(validator._min_length)))
+    if 'maxLength' in validator.schema:
+        lines += _fail_if('len(obj) > {0}'.format(
+            compiler.literal(validator._max_length)))
+    if validator._pattern is not None:
+        lines += _fail_if('{0}.match(obj) is None'.format(
+            compiler.constant(validator._pattern)))
+    if validator._format is not None:
+        lines += _fail_if('not {0}(obj)'.format(
+            compiler.constant(validator._format)))
+    if validator._unknown_format:
+        lines.append('return False')
+    return lines
+
+
+def _emit_null(compiler, validator):
+    return _fail_if('obj is not None')
+
+
+def _emit_boolean(compiler, validator):
+    return _fail_if('type(obj) is not bool')
+
+
+def _emit_enum(compiler, validator):
+    if any(isinstance(value, (list, dict))
+           for value in validator.schema['enum']):
+        key = '{0}(obj)'.format(compiler.constant(val._enum_key))
+    else:
+        # Lists and dicts can't match: their keys are unhashable and raise
+        key = '(obj.__class__ is bool, obj)'
+    lines = _fail_if('obj.__class__ not in {0}'.format(
+        compiler.constant(val._JSON_TYPES)))
+    return lines + (['try:'] +
+                    ['    ' + line for line in _fail_if(
+                        '{0} not in {1}'.format(
+                            key, compiler.constant(validator._enum)))] +
+                    ['except TypeError:',
+                     '    return False'])
+
+
+def _emit_multitype(compiler, validator):
+    if validator._typeschemas is None:
+        validator._init_typeschemas()
+    return _fail_if('not ({0})'.format(
+        compiler.call(validator._typeschemas, 'or', 'False')))
+
+
+def _emit_ref(compiler, validator):
+    return _fail_if('not {0}'.format(
+        compiler.call([validator._target or validator._init_target()],
+                      'and', 'True')))
+
+
+def _emit_anyof(compiler, validator):
+    children = [validator._init_child(child)
+                for child in validator.schema['anyOf']]
+    return _fail_if('not ({0})'.format(compiler.call(children, 'or', 'False')))
+
+
+def _emit_oneof(compiler, validator):
+    children = [validator._init_child(child)
+                for child in validator.schema['oneOf']]
+    return _fail_if('({0}) != 1'.format(compiler.call(children, '+', '0')))
+
+
+def _emit_allof(compiler, validator):
+    children = [validator._init_child(child)
+                for child in validator.schema['allOf']]
+    return _fail_if('not ({0})'.format(compiler.call(children, 'and', 'True')))
+
+
+def _emit_not(compiler, validator):
+    child = validator._init_child(validator.schema['not'])
+    return _fail_if(compiler.call([child], 'and', 'True'))
+
+
+_EMITTERS = {val.ObjectValidator: _emit_object,
+             val.ArrayValidator: _emit_array,
+             val.NumberTypeValidator: _emit_number,
+             val.IntegerTypeValidator: _emit_integer,
+             val.StringTypeValidator: _emit_string,
+             val.NullTypeValidator: _emit_null,
+             val.BooleanTypeValidator: _emit_boolean,
+             val.EnumValidator: _emit_enum,
+             val.MultiTypeValidator: _emit_multitype,
+             val.RefValidator: _emit_ref,
+             val.AnyOfValidator: _emit_anyof,
+             val.OneOfValidator: _emit_oneof,
+             val.AllOfValidator: _emit_allof,
+             val.NotValidator: _emit_not}
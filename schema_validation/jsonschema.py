@@ -2,8 +2,30 @@
 JSONSchema class implementation
 """
 
+from .compiler import SchemaCompiler
 from .utils import hash_schema, nested_dict_repr
-from .validators import ValidatorList
+from .validators import ValidatorList, SchemaValidationError
+
+
+# The keys under which child schemas appear, and how they are stored:
+# 'mapping': a dict of schemas, 'list': a list of schemas,
+# 'schema': a single schema (if a dict), 'ref': a reference to a schema.
+_CHILD_KEYS = {'properties': 'mapping',
+               'patternProperties': 'mapping',
+               'anyOf': 'list',
+               'oneOf': 'list',
+               'allOf': 'list',
+               'additionalProperties': 'schema',
+               'not': 'schema',
+               'items': 'schema',
+               '$ref': 'ref'}
+
+_DEFINITIONS_PREFIX = '#/definitions/'
+
+
+def _validate_nothing(obj):
+    """validate() for schemas which have no validators: accept anything"""
+    pass
 
 
 class JSONSchema(object):
@@ -13,6 +35,9 @@ class JSONSchema(object):
     ----------
     schema : dict
         a jsonschema dictionary
+    warn_on_unused : bool (optional)
+        if True (default), warn about schema keys which are not used by any
+        validator. Only the root's setting is used for the whole tree.
 
     Attributes
     ----------
@@ -20,11 +45,24 @@ class JSONSchema(object):
         the schema dictionary
     root : JSONSchema object
         a pointer to the root schema
-    validators : list
-        a list of Validator classes for this level of the schema
-    parents : set
+    validators : ValidatorList
+        a tuple of Validator objects for this level of the schema
+    parents : list
         a list of parent objects to the current schema
 
+    Methods
+    -------
+    validate(self, obj):
+        validate obj against the schema, raising a SchemaValidationError if it
+        is invalid. This is an instance attribute bound to the fastest
+        available implementation: schemas with a single validator call that
+        validator's validate method directly.
+    matches(self, obj):
+        return True if obj is valid under this schema, False otherwise
+    compile(self):
+        generate a specialized validation function for this schema; after
+        this is called, validate() and matches() use the generated function
+
     Notes
     -----
     The root JSONSchema has a _registry attribute, which is a dictionary mapping
@@ -40,28 +78,72 @@ class JSONSchema(object):
     Additionally, each schema will match zero or more "validator" classes, which
     can be used to validate input with the validate() method.
     """
+    # Large schemas create many of these, so avoid a per-instance __dict__.
+    # Attributes set only on the root are left unset on other instances.
+    __slots__ = ('schema', 'root', 'validators', 'validate',
+                 '_hash', '_index', '_parents', '_children',
+                 'warn_on_unused', '_hash_memo', '_registry', '_schema_to_name',
+                 '_definitions', '_validator_cache', '_by_id', '_crawled',
+                 '_compiled', '_minimal')
+
+    # Compiled validation functions, shared between identical schemas and
+    # keyed by (root hash, schema hash); least recently used entries are
+    # dropped first.
+    _compiled_cache = {}
+    _compiled_cache_size = 128
+
     def __init__(self, schema, warn_on_unused=True, **kwds):
-        unrecognized_args = kwds.keys() - {'root'}
+        unrecognized_args = kwds.keys() - {'root', 'schema_hash'}
         if unrecognized_args:
             raise ValueError('Unrecognized arguments to JSONSchema: {0}'
                              ''.format(unrecognized_args))
         self.schema = schema
         self.root = kwds.get('root', self)
-        self.validators = ValidatorList(self)
-        self.parents = set()
-
-        # Because of the use of the registry, we need to finish object creation
-        # before instantiating children. For that reason, we recursively
-        # create children from the root instance.
         if self is self.root:
-            hsh = self._schema_hash()
-            self._registry = {hsh: self}
-            self._schema_to_name = {hsh: '#'}
+            self.warn_on_unused = warn_on_unused
+            self._hash_memo = {}
+        # The hash is needed on every registry lookup and traversal step,
+        # so compute it once (or accept one the caller already computed).
+        self._hash = kwds.get('schema_hash', None) or self._hash_of(schema)
+        # Position in the root's registry, used for cheap seen-tracking;
+        # children are given theirs by initialize_child.
+        self._index = 0
+        if self is self.root:
+            # Validators may resolve references on construction, so the
+            # root's lookup tables must exist before they are created.
+            self._registry = {self._hash: self}
+            self._by_id = {id(schema): self}
+            self._schema_to_name = {self._hash: '#'}
             self._definitions = {'#': self.schema}
-            self._recursively_create_children()
+            self._validator_cache = {}
+            self._crawled = False
+        self.validators = ValidatorList(self)
+        # e.g. an enum of strings makes a type check redundant. matches()
+        # runs the same validators, so that both give the same result.
+        validators = self._minimal = self.validators.minimal()
+        if len(validators) == 0:
+            # e.g. {} or a schema with only a description: nothing to check.
+            self.validate = _validate_nothing
+        elif len(validators) == 1:
+            # Most schemas have a single validator: skip the loop over the
+            # list by calling it directly.
+            self.validate = validators[0].validate
+        else:
+            self.validate = self.validators.validate
+        self._parents = {}
+        self._children = None
+        self._compiled = None
+
+        # Children are created lazily: validation only creates the part of
+        # the tree it reaches, and the whole tree is crawled from the root
+        # the first time something needs it (see _ensure_crawled).
 
     def _schema_hash(self):
-        return hash_schema(self.schema)
+        return self._hash
+
+    def _hash_of(self, schema):
+        """Hash a schema dict, memoized by identity within this tree"""
+        return hash_schema(schema, memo=self.root._hash_memo)
 
     @classmethod
     def from_file(cls, file):
@@ -75,76 +157,182 @@ class JSONSchema(object):
     @property
     def registry(self):
         """Registry of instantiated JSONSchema objects in this tree"""
+        self._ensure_crawled()
         return self.root._registry
 
+    @property
+    def parents(self):
+        """List of JSONSchema objects which have this schema as a child"""
+        self._ensure_crawled()
+        return list(self._parents.values())
+
     @property
     def name(self):
         """Return the object name if present, otherwise return None"""
+        self._ensure_crawled()
         return self.root._schema_to_name.get(self._schema_hash(), None)
 
-    def _recursively_create_children(self, seen=None):
+    def _ensure_crawled(self):
+        """Create the whole tree of children, if not done already"""
+        root = self.root
+        if not root._crawled:
+            root._crawled = True
+            root._recursively_create_children()
+
+    def _recursively_create_children(self):
         """
-        Recursively create all children schemas,
-        ignoring any hashes that appear in seen set.
+        Create all children schemas reachable from this one.
+
+        This walks the tree with an explicit stack rather than recursion, so
+        that deeply-nested schemas cannot hit the interpreter recursion limit.
         """
-        seen = seen or set()
-        for child in self.children:
-            hsh = child._schema_hash()
-            if hsh not in seen:
-                seen.add(hsh)
-                child._recursively_create_children(seen)
+        registry = self.root._registry
+        seen = bytearray(len(registry))
+        seen[self._index] = 1
+        stack = [self]
+        while stack:
+            obj = stack.pop()
+            for child in obj.children:
+                index = child._index
+                if index >= len(seen):
+                    seen.extend(bytes(len(registry) - len(seen)))
+                if not seen[index]:
+                    seen[index] = 1
+                    stack.append(child)
 
     def initialize_child(self, schema):
         """Return a JSONSchema object wrapping a child schema"""
-        key = hash_schema(schema)
-        if key not in self.registry:
-            self.registry[key] = JSONSchema(schema, root=self.root)
-        obj = self.registry[key]
-        if self not in obj.parents:
-            obj.parents.add(self)
+        # Fast path: this exact dict has been seen before. The hash memo keeps
+        # every looked-up dict alive, so its id cannot have been reused.
+        root = self.root
+        obj = root._by_id.get(id(schema), None)
+        if obj is None:
+            key = self._hash_of(schema)
+            obj = root._registry.get(key, None)
+            if obj is None:
+                obj = JSONSchema(schema, root=root, schema_hash=key)
+                obj._index = len(root._registry)
+                root._registry[key] = obj
+            root._by_id[id(schema)] = obj
+        # Parents are keyed by identity: this avoids hashing the parent and
+        # keeps the order in which parents were first seen.
+        obj._parents.setdefault(id(self), self)
         return obj
 
     def resolve_ref(self, ref):
         """Resolve a reference within a schema"""
-        if ref not in self.root._definitions:
-            keys = ref.split('/')
-            if keys[0] != '#':
-                raise ValueError("$ref = {0} not recognized: must start with #"
-                                 "".format(self.schema['$ref']))
-            refschema = self.root.schema
-            for key in keys[1:]:
-                refschema = refschema[key]
-            self.root._definitions[ref] = refschema
-            self.root._schema_to_name[hash_schema(refschema)] = ref
-        return self.root._definitions[ref]
+        definitions = self.root._definitions
+        refschema = definitions.get(ref, None)
+        if refschema is None:
+            name = ref[len(_DEFINITIONS_PREFIX):]
+            if ref.startswith(_DEFINITIONS_PREFIX) and '/' not in name:
+                # Nearly all references are to top-level definitions.
+                refschema = self.root.schema['definitions'][name]
+            else:
+                keys = ref.split('/')
+                if keys[0] != '#':
+                    raise ValueError("$ref = {0} not recognized: "
+                                     "must start with #".format(ref))
+                refschema = self.root.schema
+                for key in keys[1:]:
+                    refschema = refschema[key]
+            definitions[ref] = refschema
+            self.root._schema_to_name[self._hash_of(refschema)] = ref
+        return refschema
 
     @property
     def children(self):
-        return [self.initialize_child(schema)
-                for schema in self.iter_child_schemas()]
+        """Tuple of JSONSchema objects wrapping the direct child schemas"""
+        # The schema is not modified after construction, so the children
+        # only need to be looked up in the registry once.
+        if self._children is None:
+            # The same dict can appear under several keys (e.g. a $ref target
+            # which is also listed directly); initialize each one only once.
+            seen = set()
+            children = []
+            for schema in self.iter_child_schemas():
+                if id(schema) not in seen:
+                    seen.add(id(schema))
+                    children.append(self.initialize_child(schema))
+            self._children = tuple(children)
+        return self._children
 
     def iter_child_schemas(self):
-        for key in ['properties', 'patternProperties']:
-            for child in self.schema.get(key, {}).values():
-                yield child
-        for key in ['anyOf', 'oneOf', 'allOf']:
-            for child in self.schema.get(key, []):
-                yield child
-        for key in ['additionalProperties', 'not', 'items']:
-            val = self.schema.get(key, None)
-            if isinstance(val, dict):
-                yield val
-        if '$ref' in self.schema:
-            yield self.resolve_ref(self.schema['$ref'])
-
-    def validate(self, obj):
-        self.validators.validate(obj)
+        for key, val in self.schema.items():
+            kind = _CHILD_KEYS.get(key, None)
+            if kind is None:
+                continue
+            elif kind == 'mapping':
+                yield from val.values()
+            elif kind == 'list':
+                yield from val
+            elif kind == 'schema':
+                if isinstance(val, dict):
+                    yield val
+            elif kind == 'ref':
+                yield self.resolve_ref(val)
+
+    def matches(self, obj):
+        """Return True if obj is valid under this schema, False otherwise"""
+        if self._compiled is not None:
+            return self._compiled(obj)
+        return self._minimal.matches(obj)
+
+    def compile(self):
+        """Compile the schema into a specialized validation function
+
+        The schema tree is translated into Python source code, with one
+        function per unique sub-schema, which is then compiled with exec().
+        Afterwards validate() and matches() use the compiled function, and
+        the validators are only used to build the message of the error
+        raised for invalid input.
+
+        Compiled functions are kept in a process-wide cache keyed by schema
+        hash, so compiling an identical schema again is a lookup. Use
+        clear_cache() to empty it.
+
+        Returns
+        -------
+        func : callable
+            a function returning True if its argument is valid under the
+            schema.
+        """
+        key = (self.root._hash, self._hash)
+        cache = self._compiled_cache
+        # Re-inserting moves the entry to the end, so that the first
+        # entry is always the least recently used.
+        func = cache.pop(key, None)
+        if func is None:
+            func = SchemaCompiler(self).compile()
+            while len(cache) >= self._compiled_cache_size:
+                del cache[next(iter(cache))]
+        cache[key] = func
+        self._compiled = func
+        self.validate = self._validate_compiled
+        return func
+
+    @classmethod
+    def clear_cache(cls):
+        """Clear the cache of compiled validation functions"""
+        cls._compiled_cache.clear()
+
+    def _validate_compiled(self, obj):
+        if not self._compiled(obj):
+            # Re-run the validators to get an informative error message.
+            self.validators.validate(obj)
+            raise SchemaValidationError("{0} is not valid under the schema"
+                                        "".format(obj))
 
     def __repr__(self):
         return "JSONSchema({0})".format(self.validators)
 
     def __eq__(self, other):
-        return self.schema == other.schema
+        # Compare the content hashes rather than the dicts: this is a single
+        # string comparison, and is consistent with __hash__ (e.g. schemas
+        # differing only in 1 vs 1.0 compare equal as dicts, but not here).
+        if not isinstance(other, JSONSchema):
+            return NotImplemented
+        return self._hash == other._hash
 
     def __hash__(self):
-        return hash(self._schema_hash())
+        return hash(self._hash)
@@ -14,12 +14,17 @@ def load_schema(filename):
     return schema
 
 
-def iter_schemas():
+def iter_schema_names():
     for filename in os.listdir(SCHEMA_DIR):
         if filename.endswith('.json'):
-            yield load_schema(filename)
+            yield filename
+
+
+def iter_schemas():
+    for filename in iter_schema_names():
+        yield load_schema(filename)
+
 
 def iter_schemas_with_names():
-    for filename in os.listdir(SCHEMA_DIR):
-        if filename.endswith('.json'):
-            yield (filename, load_schema(filename))
+    for filename in iter_schema_names():
+        yield (filename, load_schema(filename))
@@ -4,7 +4,7 @@ import json
 import pytest
 
 from ... import JSONSchema
-from .. import iter_schemas_with_names, load_schema
+from .. import iter_schema_names, load_schema
 
 num_schemas = {'jsonschema-draft04.json': 29,
                'vega-v3.0.7.json': 631,
@@ -17,23 +17,45 @@ num_definitions = {'jsonschema-draft04.json': 6,
                    'vega-lite-v2.0.json': 150}
 
 
+@pytest.fixture(scope='session')
+def schema_cache():
+    """Schemas loaded so far, shared by all tests (they are not modified)"""
+    return {}
+
+
+def _cached_schema(name, schema_cache):
+    if name not in schema_cache:
+        schema_cache[name] = load_schema(name)
+    return schema_cache[name]
+
+
+@pytest.fixture
+def schema(name, schema_cache):
+    return _cached_schema(name, schema_cache)
+
+
+@pytest.fixture
+def metaschema(schema_cache):
+    return _cached_schema('jsonschema-draft04.json', schema_cache)
+
+
 @pytest.mark.filterwarnings('ignore:Unused')
-@pytest.mark.parametrize('name,schema', iter_schemas_with_names())
+@pytest.mark.parametrize('name', list(iter_schema_names()))
 def test_full_schemas(name, schema):
     root = JSONSchema(schema)
-    assert len(root._registry) == num_schemas.get(name, None)
+    assert len(root.registry) == num_schemas.get(name, None)
     assert len(root._definitions) == num_definitions.get(name, None)
 
 
-@pytest.mark.parametrize('name,schema', iter_schemas_with_names())
-def test_metaschema(name, schema):
-    root = JSONSchema(load_schema('jsonschema-draft04.json'))
+@pytest.mark.parametrize('name', list(iter_schema_names()))
+def test_metaschema(schema, metaschema):
+    root = JSONSchema(metaschema)
     root.validate(schema)
 
 
 @pytest.mark.filterwarnings('ignore:Unused')
-def test_schema_validation():
-    schema = JSONSchema(load_schema('vega-lite-v2.0.json'))
+def test_schema_validation(schema_cache):
+    schema = JSONSchema(_cached_schema('vega-lite-v2.0.json', schema_cache))
 
     vega_lite_bar = {
       "$schema": "https://vega.github.io/schema/vega-lite/v2.json",
@@ -76,3 +98,11 @@ def test_schema_validation():
       }
     }
     schema.validate(vega_lite_github_punchcard)
+
+
+@pytest.mark.parametrize('name', list(iter_schema_names()))
+def test_compiled_metaschema(schema, metaschema):
+    root = JSONSchema(metaschema)
+    assert callable(root.compile())
+    assert root.matches(schema)
+    root.validate(schema)
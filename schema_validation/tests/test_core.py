@@ -1,6 +1,12 @@
+import copy
+import sys
+import warnings
+from decimal import Decimal
+
 import pytest
 from .. import JSONSchema, SchemaValidationError
 from .. import validators as val
+from .. import compiler
 
 
 @pytest.fixture
@@ -24,7 +30,7 @@ def definition_schema():
 
 def test_definition_schema(definition_schema):
     root = JSONSchema(definition_schema)
-    assert len(root._registry) == 11
+    assert len(root.registry) == 11
 
 
 @pytest.fixture
@@ -42,3 +48,139 @@ def test_circular_schema(circular_schema):
     root = JSONSchema(circular_schema)
     assert isinstance(root.validators[0], val.RefValidator)
     assert isinstance(root.children[0].validators[0], val.AnyOfValidator)
+
+
+def test_shared_validators():
+    root = JSONSchema({'properties': {'a': {'type': 'string'},
+                                      'b': {'type': 'string',
+                                            'description': 'foo'},
+                                      'c': {'type': 'integer'}}})
+    a, b, c = (root.initialize_child(root.schema['properties'][key])
+               for key in 'abc')
+    assert a is not b
+    assert a.validators[0] is b.validators[0]
+    assert a.validators[0] is not c.validators[0]
+
+
+def test_warn_on_unused():
+    schema = {'type': 'object',
+              'properties': {'a': {'type': 'string', 'foo': 'bar'}}}
+    with pytest.warns(UserWarning, match='Unused keys'):
+        JSONSchema(schema).registry
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        JSONSchema(schema, warn_on_unused=False).registry
+
+
+def test_deep_schema():
+    # hashing and crawling must not recurse once per level of nesting
+    depth = 2 * sys.getrecursionlimit()
+    schema = {'type': 'string'}
+    for i in range(depth):
+        schema = {'type': 'object', 'properties': {'a': schema}}
+    root = JSONSchema(schema)
+    assert len(root.registry) == depth + 1
+
+
+def test_lazy_children(definition_schema):
+    root = JSONSchema(definition_schema)
+    assert len(root._registry) == 1
+    root.validate({'a': 'foo'})
+    assert 1 < len(root._registry) < 11
+    assert len(root.registry) == 11
+
+
+def test_compiled_cache(definition_schema):
+    JSONSchema.clear_cache()
+    func = JSONSchema(definition_schema).compile()
+    assert JSONSchema(definition_schema).compile() is func
+    JSONSchema.clear_cache()
+    assert JSONSchema(definition_schema).compile() is not func
+
+
+def test_compile_error(monkeypatch):
+    # errors in the code generator are not mistaken for an uncompilable schema
+    def broken(schema_compiler, validator):
+        raise KeyError('broken')
+    monkeypatch.setitem(compiler._EMITTERS, val.StringTypeValidator, broken)
+    JSONSchema.clear_cache()
+    root = JSONSchema({'type': 'string'})
+    with pytest.raises(KeyError):
+        root.compile()
+    assert root._compiled is None
+    root.validate('a')
+
+
+def test_enum_only_validation():
+    root = JSONSchema({'type': 'string', 'enum': ['a', 'b']})
+    enum = [v for v in root.validators if isinstance(v, val.EnumValidator)]
+    assert root.validators.minimal() == tuple(enum)
+    root.validate('a')
+    with pytest.raises(SchemaValidationError):
+        root.validate('c')
+
+    # the enum includes a value which is not a string: both are needed
+    root = JSONSchema({'type': 'string', 'enum': ['a', 1]})
+    assert root.validators.minimal() is root.validators
+    with pytest.raises(SchemaValidationError):
+        root.validate(1)
+
+
+@pytest.mark.parametrize('value', [float('inf'), float('nan')])
+def test_enum_non_finite(value):
+    # int() of these raises: the schema must still build, and reject 1
+    root = JSONSchema({'type': 'integer', 'enum': [value]})
+    assert root.validators.minimal() is root.validators
+    with pytest.raises(SchemaValidationError):
+        root.validate(1)
+    assert not root.matches(1)
+
+
+class MyInt(int):
+    pass
+
+
+INT_ENUM = {'type': 'integer', 'enum': [1]}
+
+
+@pytest.mark.parametrize('value', [Decimal(1), MyInt(1)])
+@pytest.mark.parametrize('schema, wrap', [
+    (INT_ENUM, lambda x: x),
+    ({'type': 'array', 'items': INT_ENUM}, lambda x: [x]),
+    ({'anyOf': [INT_ENUM, {'type': 'string'}]}, lambda x: x)])
+def test_enum_non_json_values(schema, wrap, value):
+    # values equal to an enum value, but not of a JSON type, are rejected
+    # however the enum is reached, and whether or not it is compiled
+    root = JSONSchema(schema)
+    with pytest.raises(SchemaValidationError):
+        root.validate(wrap(value))
+    assert not root.matches(wrap(value))
+    assert callable(root.compile())
+    assert not root.matches(wrap(value))
+
+
+def test_copy_validators(definition_schema):
+    root = JSONSchema(definition_schema)
+    for obj in root.registry.values():
+        validators = copy.copy(obj.validators)
+        assert type(validators) is val.ValidatorList
+        assert validators == obj.validators
+
+
+def test_no_instance_dict(definition_schema):
+    # nodes are numerous, so all classes define __slots__
+    root = JSONSchema(definition_schema)
+    for obj in root.registry.values():
+        assert not hasattr(obj, '__dict__')
+        for validator in obj.validators:
+            assert not hasattr(validator, '__dict__')
+
+
+def test_schema_equality(definition_schema):
+    root1 = JSONSchema(definition_schema)
+    root2 = JSONSchema(dict(reversed(list(definition_schema.items()))))
+    assert root1 == root2
+    assert hash(root1) == hash(root2)
+    assert len({root1, root2}) == 1
+    assert root1 != root1.children[0]
+    assert root1 != definition_schema
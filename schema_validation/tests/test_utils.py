@@ -1,4 +1,5 @@
 import random
+import sys
 import pytest
 from ..utils import hash_schema
 
@@ -36,9 +37,20 @@ def generate_schemas():
     }
 
 
+def has_dicts(val):
+    if isinstance(val, dict):
+        return True
+    elif isinstance(val, (list, tuple)):
+        return any(map(has_dicts, val))
+    else:
+        return False
+
+
 def scramble(val):
     # scramble the order in which the dict is defined
-    if isinstance(val, dict):
+    if not has_dicts(val):
+        return val
+    elif isinstance(val, dict):
         L = [(k, scramble(v)) for k, v in val.items()]
         random.shuffle(L)
         return dict(L)
@@ -50,8 +62,41 @@ def scramble(val):
         return val
 
 
-@pytest.mark.parametrize('schema', generate_schemas())
+@pytest.mark.parametrize('schema', list(generate_schemas()))
 def test_hash_schema(schema):
     """Test that schemas compile correctly, even when order is changed"""
     hsh = hash_schema(schema)
-    assert all(hash_schema(scramble(schema)) == hsh for i in range(10))
+    # scrambling is a no-op for schemas without dicts: check them once
+    trials = 10 if has_dicts(schema) else 1
+    assert all(hash_schema(scramble(schema)) == hsh for i in range(trials))
+
+
+@pytest.mark.parametrize('schema', list(generate_schemas()))
+def test_hash_schema_memo(schema):
+    """Test that memoized hashes match the direct computation"""
+    memo = {}
+    hsh = hash_schema(schema)
+    assert hash_schema(schema, memo=memo) == hsh
+    assert hash_schema(schema, memo=memo) == hsh
+    if isinstance(schema, dict):
+        assert memo[id(schema)] == (schema, hsh)
+    # nested dicts are memoized too
+    assert all(hash_schema(obj) == h for obj, h in memo.values())
+
+
+def test_hash_schema_placeholder():
+    """Test that a nested dict does not hash like its placeholder"""
+    placeholder = ['#', hash_schema({'a': 1})]
+    assert hash_schema([{'a': 1}]) != hash_schema([placeholder])
+    assert hash_schema({'x': {'a': 1}}) != hash_schema({'x': placeholder})
+
+
+def test_hash_schema_deep():
+    """Test that hashing does not recurse once per level of nesting"""
+    schema = {'type': 'string'}
+    for i in range(2 * sys.getrecursionlimit()):
+        schema = {'properties': {'a': schema}}
+    memo = {}
+    hsh = hash_schema(schema, memo=memo)
+    assert hash_schema(schema) == hsh
+    assert len(memo) == 4 * sys.getrecursionlimit() + 1
@@ -33,19 +33,19 @@ def generate_simple_schemas():
           [val.AnyOfValidator])
 
 
-@pytest.mark.parametrize('schema, vclasses', generate_simple_schemas())
+@pytest.mark.parametrize('schema, vclasses', list(generate_simple_schemas()))
 def test_simple_schemas(schema, vclasses):
-    root = JSONSchema(schema)
-    assert len(root.validators) == len(vclasses)
-    for v in root.validators:
-        assert isinstance(v, tuple(vclasses))
+    def check_validators(root):
+        assert len(root.validators) == len(vclasses)
+        for v in root.validators:
+            assert isinstance(v, tuple(vclasses))
 
+    check_validators(JSONSchema(schema))
+
+    # meta keys don't change the validators
+    schema = dict(schema, description='this is a description')
     schema['$schema'] = 'http://foo.com/schema.json/#'
-    schema['description'] = 'this is a description'
-    root = JSONSchema(schema)
-    assert len(root.validators) == len(vclasses)
-    for v in root.validators:
-        assert isinstance(v, tuple(vclasses))
+    check_validators(JSONSchema(schema))
 
 
 def schemas_for_validation():
@@ -66,18 +66,48 @@ def schemas_for_validation():
            [[1,'hello'], [None, True]], [1, 'hello'])
     yield ({"type": "array", 'items': {'type': 'number'}},
            [[1,2], [0.1, 2.5]], [[2.0, 'hello'], [1, None]])
+    yield ({"type": "array", 'items': {'type': 'string', 'maxLength': 3,
+                                       'pattern': '^[a-z]'}},
+           [['a', 'bcd'], []], [['a', 'bcde'], ['a', 'B'], ['a', 1]])
     yield ({"enum": [5, "hello", None, False]},
            [5, "hello", None, False], [2, 'blah', True])
     yield ({"type": "string", "enum": ['a', 'b', 'c']},
            ['a', 'b', 'c'], [2, 'blah', True])
+    yield ({"enum": [1, "a", [1, 2], {"b": 3}]},
+           [1, "a", [1, 2], {"b": 3}], [2, "b", [1], {"b": 4}])
+    yield ({"enum": [1, "a"]},
+           [1, "a", 1.0], [2, "b", [1], {"b": 4}, True])
+    yield ({"enum": [True, 0, [1]]},
+           [True, 0, [1]], [1, False, 0.5, [2]])
+    yield ({"enum": [[1], {"a": 0}, [{"b": [True]}]]},
+           [[1], [1.0], {"a": 0}, [{"b": [True]}]],
+           [[True], {"a": False}, [{"b": [1]}], (1,)])
     yield ({"type": "number", "minimum": 0, "maximum": 1},
            [0, 0.5, 1], [-1, 2])
     yield ({"type": "number", "exclusiveMinimum": 0, "exclusiveMaximum": 1},
            [0.01, 0.5, 0.99], [0, 1])
+    yield ({"type": "integer", "minimum": 0, "maximum": 10},
+           [0, 5, 10], [-1, 11])
     yield ({"type": "string", 'minLength': 2, 'maxLength': 5},
            ["12", "123", "12345"], ["", "1", "123456"])
     yield ({"type": "string", "pattern": "^[a-zA-Z1-9]+$"},
            ['abc', 'ABc2', 'Zxy4'], ['', '1-9', 'A&4'])
+    yield ({"type": "string", "format": "date-time"},
+           ['2017-01-01T12:00:00Z', '2017-01-01 12:00:00.5+01:00'],
+           ['2017-01-01', '12:00:00', '2017-01-01T12:00:00Z\n'])
+    yield ({"type": "string", "format": "ipv4"},
+           ['127.0.0.1'], ['256.0.0.1', '::1', 'localhost'])
+    yield ({"type": "string", "format": "ipv6"},
+           ['::1', 'fe80::1'], ['127.0.0.1', ':::'])
+    yield ({"type": "string", "format": "hostname"},
+           ['localhost', 'example.com'], ['-foo.com', 'foo..com', ''])
+    yield ({"type": "string", "format": "uri"},
+           ['http://example.com/a?b#c', 'urn:isbn:0451450523'],
+           ['example.com', 'http://a b', ''])
+    yield ({"type": "string", "format": "email"},
+           ['a@b.com'], ['a.b.com', 'a@b@c', 'a @b'])
+    yield ({"type": "string", "format": "regex"},
+           ['^[a-z]+$', ''], ['(', '[a-'])
     yield ({'type': 'object', 'properties': {'a': {'type': 'integer'}}},
            [{'a':4}, {'a':0, 'b':5}], [1, {'a':'foo'}, None])
     yield ({'properties': {'a': {'type': 'integer'}},
@@ -90,11 +120,22 @@ def schemas_for_validation():
     yield ({'type': 'object', 'additionalProperties': {'type': 'string'}},
            [{'a': 'foo'}, {'a': 'blah', 'b': 'hello'}],
            [{'a':4}, {'a':0, 'b':5}])
+    yield ({'properties': {'a': {'type': 'integer'}},
+            'patternProperties': {'^x-': {'type': 'string'},
+                                  'b': {'type': 'boolean'}},
+            'additionalProperties': False},
+           [{'a': 4, 'x-foo': 'bar'}, {'abc': True}, {}],
+           [{'x-foo': 4}, {'c': 1}, {'a': 'foo'}, {'x-b': 'bar'}])
     yield ({'$ref': '#/definitions/Foo',
             'definitions': {'Foo': {'type': 'string'}}},
            ['a', 'b', 'c'], [1, None, False])
     yield({'anyOf': [{'type': 'integer'}, {'type': 'object'}]},
           [1, {}, {'foo': 'bar'}], ['hello', None])
+    yield({'anyOf': [{'type': 'string', 'maxLength': 2},
+                     {'type': 'null'}, {'enum': [1, 'abc']}]},
+          ['ab', 'abc', 1, None], ['abcd', 2, True])
+    yield({'oneOf': [{'type': 'integer'}, {'enum': [1, 'a']}]},
+          [2, 'a'], [1, 'b', None])
     yield({'allOf': [{'properties': {'a': {'type': 'integer'}}, 'required': ['a']},
                      {'properties': {'b': {'type': 'string'}}}]},
           [{'a': 1}, {'a': 1, 'b': '2'}], [{'b': 'yo'}, 4, None])
@@ -104,7 +145,7 @@ def schemas_for_validation():
           [1.5, 'blah', None], [1, 2.0])
 
 
-@pytest.mark.parametrize('schema,valid,invalid', schemas_for_validation())
+@pytest.mark.parametrize('schema,valid,invalid', list(schemas_for_validation()))
 def test_simple_validation(schema, valid, invalid):
     schemaobj = JSONSchema(schema)
 
@@ -114,3 +155,81 @@ def test_simple_validation(schema, valid, invalid):
     for value in invalid:
         with pytest.raises(SchemaValidationError):
             schemaobj.validate(value)
+
+
+@pytest.mark.parametrize('schema,valid,invalid', list(schemas_for_validation()))
+def test_validate_many(schema, valid, invalid):
+    schemaobj = JSONSchema(schema)
+
+    for validator in schemaobj.validators:
+        validator.validate_many(valid)
+
+    for value in invalid:
+        with pytest.raises(SchemaValidationError):
+            for validator in schemaobj.validators:
+                validator.validate_many(valid + [value])
+
+
+@pytest.mark.parametrize('schema,valid,invalid', list(schemas_for_validation()))
+def test_matches(schema, valid, invalid):
+    schemaobj = JSONSchema(schema)
+    assert all(schemaobj.matches(value) for value in valid)
+    assert not any(schemaobj.matches(value) for value in invalid)
+
+
+class EvenValidator(val.Validator):
+    """Example of a validator defined outside the validators module"""
+    recognized_keys = frozenset({'x-even'})
+
+    @classmethod
+    def _matches(cls, schema):
+        return 'x-even' in schema
+
+    def validate(self, obj):
+        if obj % 2:
+            raise SchemaValidationError("{0} is not even".format(obj))
+
+
+def test_extension_validator():
+    schema = JSONSchema({'type': 'integer', 'x-even': True})
+    assert len(schema.validators) == 2
+    assert isinstance(schema.validators[1], EvenValidator)
+    schema.validate(4)
+    with pytest.raises(SchemaValidationError):
+        schema.validate(3)
+
+
+@pytest.mark.parametrize('schema,valid,invalid', list(schemas_for_validation()))
+def test_compiled_validation(schema, valid, invalid):
+    schemaobj = JSONSchema(schema)
+    assert callable(schemaobj.compile())
+
+    for value in valid:
+        assert schemaobj.matches(value)
+        schemaobj.validate(value)
+
+    for value in invalid:
+        assert not schemaobj.matches(value)
+        with pytest.raises(SchemaValidationError):
+            schemaobj.validate(value)
+
+
+def test_numeric_array_items():
+    class Float(float):
+        pass
+
+    schema = JSONSchema({'type': 'array',
+                         'items': {'type': 'integer', 'minimum': 0}})
+    schema.validate([0, 1, 2.0])
+    # types are checked exactly: subclasses of int and float are rejected
+    for invalid in [[0, -1], [0, 1.5], [0, True], [0, Float(3)]]:
+        with pytest.raises(SchemaValidationError):
+            schema.validate(invalid)
+
+    # a leading NaN must not hide the bounds of the other items
+    schema = JSONSchema({'type': 'array',
+                         'items': {'type': 'number', 'minimum': 0}})
+    with pytest.raises(SchemaValidationError):
+        schema.validate([float('nan'), -1])
+    assert callable(schema.compile())
+    assert not schema.matches([float('nan'), -1])
@@ -1,16 +1,22 @@
-import json
 import hashlib
 
 
+class _EllipsisDict(object):
+    """Placeholder shown in place of dicts nested too deeply to display"""
+    __slots__ = ()
+
+    def __repr__(self):
+        return "{...}"
+
+
+_ELLIPSIS_DICT = _EllipsisDict()
+
+
 def nested_dict_repr(obj, depth=1):
     """Return an object with a cleaner representation of a nested dict"""
-    class EllipsisDict(object):
-        def __repr__(self):
-            return "{...}"
-
     if isinstance(obj, dict):
         if depth <= 0:
-            return EllipsisDict()
+            return _ELLIPSIS_DICT
         else:
             return {k: nested_dict_repr(v, depth - 1)
                     for k, v in obj.items()}
@@ -18,11 +24,77 @@ def nested_dict_repr(obj, depth=1):
         return obj
 
 
-def hash_schema(schema, hashfunc=hashlib.sha256):
-    """Compute a unique hash for a JSON schema"""
-    s = json.dumps(schema, sort_keys=True)
+def hash_schema(schema, hashfunc=hashlib.sha256, memo=None):
+    """Compute a unique hash for a JSON schema
+
+    The hash is built bottom-up: each nested dict is hashed once, and its
+    parent's hash is computed from the ascii() repr of its own sorted items
+    with nested dicts replaced by their hashes. This way no part of the
+    schema is serialized more than once, however deeply it is nested.
+
+    If ``memo`` is a dict, hashes of dict schemas are cached in it keyed by
+    ``id(schema)``, so that hashing the same dict object again is a single
+    lookup. The memo holds a reference to each schema so that ids cannot be
+    reused while it is alive; memoized schemas must not be mutated.
+    """
+    if memo is None:
+        memo = {}
+    _hash_dicts(schema, hashfunc, memo)
+    if isinstance(schema, dict):
+        return memo[id(schema)][1]
+    s = ascii(_replace_dicts(schema, memo))
     return hashfunc(s.encode()).hexdigest()
 
 
+_CONTAINERS = (dict, list, tuple)
+
+
+def _hash_dicts(schema, hashfunc, memo):
+    """Add the hash of each dict within schema to memo, children first
+
+    This walks the schema with an explicit stack rather than recursion, so
+    that deeply-nested schemas cannot hit the interpreter recursion limit.
+    """
+    # Containers whose children are still being hashed: meeting one of
+    # these again means the schema contains itself.
+    pending = set()
+    stack = [(schema, False)] if isinstance(schema, _CONTAINERS) else []
+    while stack:
+        obj, children_done = stack.pop()
+        if children_done:
+            pending.discard(id(obj))
+            if isinstance(obj, dict):
+                items = sorted((key, _replace_dicts(val, memo)
+                                if isinstance(val, _CONTAINERS) else val)
+                               for key, val in obj.items())
+                hsh = hashfunc(ascii(items).encode()).hexdigest()
+                memo[id(obj)] = (obj, hsh)
+            continue
+        if id(obj) in memo:
+            continue
+        if id(obj) in pending:
+            raise ValueError("Circular reference detected")
+        pending.add(id(obj))
+        stack.append((obj, True))
+        values = obj.values() if isinstance(obj, dict) else obj
+        stack.extend((val, False) for val in values
+                     if isinstance(val, _CONTAINERS))
+
+
+def _replace_dicts(obj, memo):
+    """Replace each dict within obj by a placeholder holding its hash"""
+    if isinstance(obj, dict):
+        # Lists and tuples are both serialized as lists, so the tuple
+        # placeholder cannot be confused with an input value.
+        return ('#', memo[id(obj)][1])
+    elif isinstance(obj, (list, tuple)):
+        return [_replace_dicts(val, memo)
+                if isinstance(val, _CONTAINERS) else val for val in obj]
+    else:
+        return obj
+
+
 def isnumeric(val):
-    return isinstance(val, (int, float)) and not isinstance(val, bool)
+    # Exact type checks: bool (a subclass of int) is not numeric in JSON
+    typ = type(val)
+    return typ is int or typ is float
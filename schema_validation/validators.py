@@ -1,17 +1,110 @@
 """Objects that implement schema validation"""
 
+import ipaddress
+import math
+import sys
 import warnings
 import re
 
 from .utils import isnumeric
 
+
+# Keys which carry no validation semantics of their own
+META_KEYS = frozenset({'definitions', 'description', 'title', '$schema'})
+
+# Validator subclasses defined outside this module; see Validator
+_EXTENSION_CLASSES = []
+
+
 class SchemaValidationError(Exception):
     pass
 
 
-class ValidatorList(list):
+def _bounds(schema):
+    """Return (minimum, maximum, exclusiveMinimum, exclusiveMaximum) of schema
+
+    Bounds which are not specified are replaced by the appropriate infinity.
+    """
+    return (schema.get('minimum', -math.inf),
+            schema.get('maximum', math.inf),
+            schema.get('exclusiveMinimum', -math.inf),
+            schema.get('exclusiveMaximum', math.inf))
+
+
+def _create_validator(cls, schema, parent):
+    """Create a Validator instance, reusing an existing one where possible
+
+    Validators whose schema contains only scalar values (e.g. ``{'type':
+    'string'}``) behave the same regardless of which node they belong to,
+    so a single instance is shared by all such nodes within a schema tree.
+    The shared instances are stored on the root, as validators hold a
+    reference to their parent (and through it, the root).
+    """
+    try:
+        # Include the type so that e.g. 1 and True are not conflated
+        key = (cls, frozenset((k, type(v), v) for k, v in schema.items()))
+    except TypeError:  # schema contains unhashable values: don't share
+        return cls(schema, parent=parent)
+    cache = parent.root._validator_cache
+    if key not in cache:
+        cache[key] = cls(schema, parent=parent)
+    return cache[key]
+
+
+# Exact types of numeric and string JSON values. Checking
+# set(map(type, values)) against these runs at C speed; other types (e.g.
+# subclasses of str) are left to the item-by-item check.
+_NUMERIC_TYPES = frozenset({int, float})
+_STRING_TYPES = frozenset({str})
+
+
+def _lengths_in_bounds(values, validator):
+    """Return True if all string lengths lie within the validator's bounds"""
+    if not values:
+        return True
+    lengths = list(map(len, values))
+    return (min(lengths) >= validator._min_length
+            and max(lengths) <= validator._max_length)
+
+
+def _in_bounds(values, validator):
+    """Return True if all numeric values lie within the validator's bounds
+
+    A NaN in the first position makes min() and max() return NaN, which
+    compares False against every bound: return False in that case, so the
+    values are checked one at a time.
+    """
+    if not values:
+        return True
+    lo, hi = min(values), max(values)
+    if lo != lo or hi != hi:
+        return False
+    return not (lo < validator._minimum or hi > validator._maximum
+                or lo <= validator._exclusive_minimum
+                or hi >= validator._exclusive_maximum)
+
+
+def _bounds_error(obj, schema):
+    """Return a SchemaValidationError for the first bound that obj violates"""
+    if 'minimum' in schema and obj < schema['minimum']:
+        return SchemaValidationError("{0} is less than minimum={1}"
+                                     "".format(obj, schema['minimum']))
+    if 'maximum' in schema and obj > schema['maximum']:
+        return SchemaValidationError("{0} is greater than maximum={1}"
+                                     "".format(obj, schema['maximum']))
+    if 'exclusiveMinimum' in schema and obj <= schema['exclusiveMinimum']:
+        return SchemaValidationError("{0} is less than exclusiveMinimum={1}"
+                                     "".format(obj, schema['exclusiveMinimum']))
+    return SchemaValidationError("{0} is greater than exclusiveMaximum={1}"
+                                 "".format(obj, schema['exclusiveMaximum']))
+
+
+class ValidatorList(tuple):
     """Instantiate a list of validators given a JSONSchema
 
+    The validators are stored as an (immutable) tuple, as they do not change
+    once the schema object has been created.
+
     Parameters
     ----------
     obj : JSONSchema object
@@ -21,43 +114,114 @@ class ValidatorList(list):
     -------
     validate(self, value):
         validate value with all validators in list
+    matches(self, value):
+        return True if value passes all validators in list
+    minimal(self):
+        return the validators which need to be run to validate a value
     """
-    def __init__(self, obj):
-        super(ValidatorList, self).__init__()
-        validator_classes = [cls for cls in Validator.__subclasses__()
-                             if cls._matches(obj.schema)]
-
-        used_keys = {'definitions', 'description', 'title', '$schema'}
-        for cls in validator_classes:
-            cls_schema = {key:val for key, val in obj.schema.items()
-                          if key in cls.recognized_keys}
-            used_keys |= cls_schema.keys()
-            self.append(cls(cls_schema, parent=obj))
-        unused = obj.schema.keys() - used_keys
-        if unused:
-            warnings.warn("Unused keys {0} in {1}"
-                          "".format(unused, self))
+    __slots__ = ()
+
+    def __new__(cls, obj):
+        schema = obj.schema
+        if schema.keys() <= META_KEYS:
+            # e.g. {} or a root holding only definitions: nothing to do
+            return super(ValidatorList, cls).__new__(cls)
+        validators = []
+        for vcls in _matching_classes(schema):
+            cls_keys = vcls.recognized_keys & schema.keys()
+            validators.append(_create_validator(
+                vcls, {key: schema[key] for key in cls_keys}, obj))
+        self = super(ValidatorList, cls).__new__(cls, validators)
+
+        # Only do the bookkeeping for unused keys if it will be reported
+        if obj.root.warn_on_unused:
+            unused = schema.keys() - META_KEYS
+            for validator in validators:
+                unused -= validator.schema.keys()
+            if unused:
+                warnings.warn("Unused keys {0} in {1}"
+                              "".format(unused, self))
+        return self
+
+    def __reduce__(self):
+        # __new__ builds the validators from a JSONSchema, but copy and
+        # pickle pass it the tuple contents: rebuild from those instead.
+        return (tuple.__new__, (type(self), tuple(self)))
 
     def validate(self, obj):
         for validator in self:
             validator.validate(obj)
 
+    def matches(self, obj):
+        for validator in self:
+            if not validator.matches(obj):
+                return False
+        return True
+
+    def minimal(self):
+        """Return the validators which need to be run to validate a value
+
+        The enum validator only accepts values of the exact types produced
+        by json.load, and a value it accepts then has the same JSON type,
+        bounds and string contents as one of the enum's values. So when
+        every enum value passes the other validators, checking the enum
+        alone is enough. This is only done when the other validators check
+        scalars, as they can be run safely while the schema tree is being
+        built, and when the enum values are JSON values which are finite:
+        int(inf) raises, and NaN equals nothing.
+        """
+        enums = [v for v in self if isinstance(v, EnumValidator)]
+        if len(self) < 2 or not enums:
+            return self
+        enum, others = enums[0], [v for v in self if v is not enums[0]]
+        values = enum.schema['enum']
+        if (all(isinstance(v, _SCALAR_VALIDATORS) for v in others)
+                and all(type(val) in _JSON_TYPES for val in values)
+                and all(math.isfinite(val) for val in values
+                        if type(val) is float)
+                and all(v.matches(val) for v in others for val in values)):
+            return tuple.__new__(ValidatorList, (enum,))
+        return self
+
 
 class Validator(object):
     """Abstract base class for JSONSchema validation.
 
     This class should not be used directly; rather use the ValidatorList class
+
+    Validators defined in this module are found through the dispatch tables
+    at the bottom of the module. Direct subclasses defined elsewhere are
+    recorded when they are created, and are matched to schemas with their
+    ``_matches`` classmethod.
     """
-    recognized_keys = set()
+    __slots__ = ('schema', 'parent')
+    recognized_keys = frozenset()
+
+    # Python types of the JSON values this validator can accept, or None if
+    # it accepts values of any type (see _branches_by_type)
+    json_types = None
+
+    # ValidatorList only passes recognized keys, so this check can only fire
+    # for validators constructed by hand; it is skipped under ``python -O``.
+    _CHECK_UNRECOGNIZED = __debug__
+
+    def __init_subclass__(cls, **kwargs):
+        super(Validator, cls).__init_subclass__(**kwargs)
+        if cls.__module__ != __name__ and Validator in cls.__bases__:
+            _EXTENSION_CLASSES.append(cls)
 
     def __init__(self, schema, parent):
         self.schema = schema
         self.parent = parent
 
-        unrecognized = set(schema.keys()) - set(self.recognized_keys)
-        if unrecognized:
-            warnings.warn('Unrecognized keys {0} in class {1}'
-                          ''.format(unrecognized, self.__class__.__name__))
+        if self._CHECK_UNRECOGNIZED and parent.root.warn_on_unused:
+            # recognized_keys is a frozenset on every class, so the difference
+            # can be taken directly against the dict keys view.
+            unrecognized = schema.keys() - self.recognized_keys
+            if unrecognized:
+                warnings.warn('Unrecognized keys {0} in class {1}'
+                              ''.format(unrecognized,
+                                        self.__class__.__name__))
 
     def _init_child(self, schema):
         """Initialize a child JSONSchema object from a schema dict"""
@@ -77,146 +241,348 @@ class Validator(object):
     def validate(self, value):
         raise NotImplementedError()
 
+    def matches(self, value):
+        """Return True if value is valid, False otherwise
+
+        Subclasses with cheap checks override this to avoid the cost of
+        raising and catching a SchemaValidationError.
+        """
+        try:
+            self.validate(value)
+        except SchemaValidationError:
+            return False
+        return True
+
+    def validate_many(self, values):
+        """Validate each item in a list of values"""
+        for value in values:
+            self.validate(value)
+
 
 class ObjectValidator(Validator):
-    recognized_keys = {'type', 'properties', 'additionalProperties',
-                       'patternProperties', 'required'}
-    # TODO: handle pattern properties
+    __slots__ = ('_is_object', '_required', '_additional', '_properties',
+                 '_patterns')
+    recognized_keys = frozenset({'type', 'properties', 'additionalProperties',
+                                 'patternProperties', 'required'})
     @classmethod
     def _matches(cls, schema):
         return (schema.get('type', None) == 'object'
                  or 'properties' in schema
+                 or 'patternProperties' in schema
                  or 'additionalProperties' in schema)
 
+    def __init__(self, schema, parent):
+        super(ObjectValidator, self).__init__(schema, parent)
+        self._is_object = schema.get('type', None) == 'object'
+        self._required = frozenset(schema.get('required', ()))
+        self._additional = schema.get('additionalProperties', True)
+        # Mapping of property name -> JSONSchema, and list of
+        # (compiled pattern, JSONSchema) pairs, created on first use: child
+        # schemas cannot be created while the parent is still being built.
+        self._properties = None
+        self._patterns = None
+
+    @property
+    def json_types(self):
+        if self._is_object or self._required:
+            return frozenset({dict})
+        return None  # non-dict values pass unchecked
+
+    def _init_properties(self):
+        # Interned names let lookups with interned input keys (e.g. string
+        # literals) succeed on the identity check, without comparing.
+        self._properties = {sys.intern(key): self._init_child(val)
+                            for key, val
+                            in self.schema.get('properties', {}).items()}
+        self._patterns = [(re.compile(pattern), self._init_child(val))
+                          for pattern, val
+                          in self.schema.get('patternProperties', {}).items()]
+        if isinstance(self._additional, dict):
+            self._additional = self._init_child(self._additional)
+
+    def _validate_patterns(self, key, val):
+        """Validate val against each pattern matching key.
+
+        Return True if any pattern matched.
+        """
+        matched = False
+        for regex, child in self._patterns:
+            if regex.search(key) is not None:
+                matched = True
+                child.validate(val)
+        return matched
+
     def validate(self, obj):
-        required = self.schema.get('required', [])
         if not isinstance(obj, dict):
-            if self.schema.get('type', None) == 'object':
+            if self._is_object:
                 raise SchemaValidationError("{0} is not of type='object'"
                                             "".format(obj))
-            if required:
+            if self._required:
                 raise SchemaValidationError("{0} is missing properties {1}"
-                                            "".format(obj, required))
-        if not all(key in obj for key in self.schema.get('required', [])):
-            raise SchemaValidationError("{0} does not contain required keys {1}"
-                                        "".format(obj, self.schema['required']))
-        if isinstance(obj, dict):
-            for key, val in obj.items():
-                properties = self.schema.get('properties', {})
-                patternProperties = self.schema.get('patternProperties', {})
-                additionalProperties = self.schema.get('additionalProperties', True)
-                if key in properties:
-                    self._init_child(properties[key]).validate(val)
-                elif patternProperties:
-                    raise NotImplementedError('patternProperties validation')
-                elif isinstance(additionalProperties, dict):
-                    self.parent.initialize_child(additionalProperties).validate(val)
-                elif not additionalProperties:
-                    raise SchemaValidationError("{0} property {1} is invalid"
-                                                "".format(obj, key))
+                                            "".format(obj,
+                                                      self.schema['required']))
+            return
+        if not obj.keys() >= self._required:
+            raise SchemaValidationError("{0} does not contain required "
+                                        "keys {1}".format(
+                                            obj, self.schema['required']))
+        if self._properties is None:
+            self._init_properties()
+        properties = self._properties
+        patterns = self._patterns
+        additional = self._additional
+        for key, val in obj.items():
+            child = properties.get(key, None)
+            if child is not None:
+                child.validate(val)
+            # additionalProperties applies only to keys matched by neither
+            # properties nor patternProperties.
+            if patterns and self._validate_patterns(key, val):
+                continue
+            if child is not None or additional is True:
+                continue
+            elif not additional:
+                raise SchemaValidationError("{0} property {1} is invalid"
+                                            "".format(obj, key))
+            else:
+                additional.validate(val)
 
 
 class ArrayValidator(Validator):
-    recognized_keys = {'type', 'items', 'minItems', 'maxItems', 'numItems'}
+    __slots__ = ('_min_items', '_max_items', '_num_items', '_items')
+    recognized_keys = frozenset({'type', 'items',
+                                 'minItems', 'maxItems', 'numItems'})
+    json_types = frozenset({list})
     @classmethod
     def _matches(cls, schema):
         return schema.get('type', None) == 'array' or 'items' in schema
 
+    def __init__(self, schema, parent):
+        super(ArrayValidator, self).__init__(schema, parent)
+        self._min_items = schema.get('minItems', 0)
+        self._max_items = schema.get('maxItems', math.inf)
+        self._num_items = schema.get('numItems', None)
+        # The JSONSchema for the items, created on first use: it cannot be
+        # created while the parent is still being built.
+        self._items = None
+
+    def _init_items(self):
+        self._items = self._init_child(self.schema['items'])
+        return self._items
+
     def validate(self, obj):
         if not isinstance(obj, list):
             raise SchemaValidationError()
-        if 'minItems' in self.schema and len(obj) < self.schema['minItems']:
-            raise SchemaValidationError()
-        if 'maxItems' in self.schema and len(obj) > self.schema['maxItems']:
-            raise SchemaValidationError()
-        if 'numItems' in self.schema and len(obj) != self.schema['numItems']:
+        n = len(obj)
+        if (n < self._min_items or n > self._max_items
+                or (self._num_items is not None and n != self._num_items)):
             raise SchemaValidationError()
         if 'items' in self.schema:
-            itemtype = self._init_child(self.schema['items'])
-            for val in obj:
-                itemtype.validate(val)
+            itemtype = self._items or self._init_items()
+            # Validate the whole list with each item validator, so that
+            # numeric bounds can be checked in bulk (see validate_many). An
+            # item schema without validators (e.g. {}) accepts anything.
+            for validator in itemtype.validators:
+                validator.validate_many(obj)
 
 
 class NumberTypeValidator(Validator):
-    recognized_keys = {'type', 'minimum', 'maximum', 'default',
-                       'exclusiveMinimum', 'exclusiveMaximum'}
+    __slots__ = ('_minimum', '_maximum',
+                 '_exclusive_minimum', '_exclusive_maximum')
+    recognized_keys = frozenset({'type', 'minimum', 'maximum', 'default',
+                                 'exclusiveMinimum', 'exclusiveMaximum'})
+    json_types = frozenset({int, float})
     @classmethod
     def _matches(cls, schema):
         return schema.get('type', None) == 'number'
 
+    def __init__(self, schema, parent):
+        super(NumberTypeValidator, self).__init__(schema, parent)
+        # Missing bounds become infinite so validate() can compare
+        # unconditionally rather than testing for each key.
+        (self._minimum, self._maximum,
+         self._exclusive_minimum, self._exclusive_maximum) = _bounds(schema)
+
     def validate(self, obj):
         if not isnumeric(obj):
             raise SchemaValidationError("{0} is not a numeric type"
                                         "".format(obj))
-        if 'minimum' in self.schema and obj < self.schema['minimum']:
-            raise SchemaValidationError("{0} is less than minimum={1}"
-                                        "".format(obj, self.schema['minimum']))
-        if 'maximum' in self.schema and obj > self.schema['maximum']:
-            raise SchemaValidationError("{0} is greater than maximum={1}"
-                                        "".format(obj, self.schema['maximum']))
-        if 'exclusiveMinimum' in self.schema and obj <= self.schema['exclusiveMinimum']:
-            raise SchemaValidationError("{0} is less than exclusiveMinimum={1}"
-                                        "".format(obj, self.schema['exclusiveMinimum']))
-        if 'exclusiveMaximum' in self.schema and obj >= self.schema['exclusiveMaximum']:
-            raise SchemaValidationError("{0} is greater than exclusiveMaximum={1}"
-                                        "".format(obj, self.schema['exclusiveMaximum']))
+        if (obj < self._minimum or obj > self._maximum
+                or obj <= self._exclusive_minimum
+                or obj >= self._exclusive_maximum):
+            raise _bounds_error(obj, self.schema)
+
+    def matches(self, obj):
+        return (isnumeric(obj)
+                and self._minimum <= obj <= self._maximum
+                and self._exclusive_minimum < obj < self._exclusive_maximum)
+
+    def validate_many(self, values):
+        """Validate each item in a list of values
+
+        The types and bounds are checked for the whole list at once, using
+        set(map(type, ...)) and the builtin min() and max(); items are only
+        checked one at a time if this fails, to find the offending value.
+        """
+        if (not set(map(type, values)) <= _NUMERIC_TYPES
+                or not _in_bounds(values, self)):
+            super(NumberTypeValidator, self).validate_many(values)
 
 
 class IntegerTypeValidator(Validator):
-    recognized_keys = {'type', 'mimimum', 'maximum', 'default',
-                       'exclusiveMinimum', 'exclusiveMaximum'}
+    __slots__ = ('_minimum', '_maximum',
+                 '_exclusive_minimum', '_exclusive_maximum')
+    recognized_keys = frozenset({'type', 'minimum', 'maximum', 'default',
+                                 'exclusiveMinimum', 'exclusiveMaximum'})
+    json_types = frozenset({int, float})
     @classmethod
     def _matches(cls, schema):
         return schema.get('type', None) == 'integer'
 
+    def __init__(self, schema, parent):
+        super(IntegerTypeValidator, self).__init__(schema, parent)
+        # Missing bounds become infinite so validate() can compare
+        # unconditionally rather than testing for each key.
+        (self._minimum, self._maximum,
+         self._exclusive_minimum, self._exclusive_maximum) = _bounds(schema)
+
     def validate(self, obj):
         if not isnumeric(obj):
             raise SchemaValidationError("{0} is not a numeric type"
                                         "".format(obj))
         if not int(obj) == obj:
             raise SchemaValidationError("{0} is not an integer".format(obj))
-        if 'minimum' in self.schema and obj < self.schema['minimum']:
-            raise SchemaValidationError("{0} is less than minimum={1}"
-                                        "".format(obj, self.schema['minimum']))
-        if 'maximum' in self.schema and obj > self.schema['maximum']:
-            raise SchemaValidationError("{0} is greater than maximum={1}"
-                                        "".format(obj, self.schema['maximum']))
-        if 'exclusiveMinimum' in self.schema and obj <= self.schema['exclusiveMinimum']:
-            raise SchemaValidationError("{0} is less than exclusiveMinimum={1}"
-                                        "".format(obj, self.schema['exclusiveMinimum']))
-        if 'exclusiveMaximum' in self.schema and obj >= self.schema['exclusiveMaximum']:
-            raise SchemaValidationError("{0} is greater than exclusiveMaximum={1}"
-                                        "".format(obj, self.schema['exclusiveMaximum']))
+        if (obj < self._minimum or obj > self._maximum
+                or obj <= self._exclusive_minimum
+                or obj >= self._exclusive_maximum):
+            raise _bounds_error(obj, self.schema)
+
+    def matches(self, obj):
+        return (isnumeric(obj) and int(obj) == obj
+                and self._minimum <= obj <= self._maximum
+                and self._exclusive_minimum < obj < self._exclusive_maximum)
+
+    def validate_many(self, values):
+        """Validate each item in a list of values
+
+        The types and bounds are checked for the whole list at once, using
+        set(map(type, ...)) and the builtin min() and max(); items are only
+        checked one at a time if this fails, to find the offending value.
+        """
+        types = set(map(type, values))
+        if (not types <= _NUMERIC_TYPES
+                or (float in types
+                    and not all(int(val) == val for val in values))
+                or not _in_bounds(values, self)):
+            super(IntegerTypeValidator, self).validate_many(values)
+
+
+def _is_ip_address(cls):
+    def check(value):
+        try:
+            cls(value)
+        except ValueError:
+            return False
+        return True
+    return check
+
+
+def _is_regex(value):
+    try:
+        re.compile(value)
+    except re.error:
+        return False
+    return True
+
+
+# Checks for the string formats defined by JSON Schema: each returns a true
+# value if the string is valid. Regexes are compiled once, here; they are
+# deliberately lenient, only rejecting strings which are clearly malformed.
+_FORMAT_CHECKS = {
+    'date-time': re.compile(r'\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}:\d{2}'
+                            r'(\.\d+)?([Zz]|[+-]\d{2}:\d{2})').fullmatch,
+    'email': re.compile(r'[^@\s]+@[^@\s]+').fullmatch,
+    'hostname': re.compile(r'(?=.{1,253}\.?\Z)[A-Za-z0-9]'
+                           r'([A-Za-z0-9-]{0,61}[A-Za-z0-9])?'
+                           r'(\.[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*'
+                           r'\.?').fullmatch,
+    'ipv4': _is_ip_address(ipaddress.IPv4Address),
+    'ipv6': _is_ip_address(ipaddress.IPv6Address),
+    'uri': re.compile(r'[A-Za-z][A-Za-z0-9+.-]*:\S*').fullmatch,
+    'regex': _is_regex,
+}
 
 
 class StringTypeValidator(Validator):
-    recognized_keys = {'type', 'pattern', 'format',
-                       'minLength', 'maxLength', 'default'}
-    valid_formats = ['date-time', 'email', 'hostname', 'ipv4', 'ipv6', 'uri']
+    __slots__ = ('_min_length', '_max_length', '_pattern', '_format',
+                 '_unknown_format')
+    recognized_keys = frozenset({'type', 'pattern', 'format',
+                                 'minLength', 'maxLength', 'default'})
+    json_types = frozenset({str})
+    valid_formats = sorted(_FORMAT_CHECKS)
     @classmethod
     def _matches(cls, schema):
         return schema.get('type', None) == 'string'
 
+    def __init__(self, schema, parent):
+        super(StringTypeValidator, self).__init__(schema, parent)
+        self._min_length = schema.get('minLength', 0)
+        self._max_length = schema.get('maxLength', math.inf)
+        pattern = schema.get('pattern', None)
+        self._pattern = None if pattern is None else re.compile(pattern)
+        fmt = schema.get('format', None)
+        self._format = _FORMAT_CHECKS.get(fmt, None)
+        self._unknown_format = fmt is not None and self._format is None
+
     def validate(self, obj):
         if not isinstance(obj, str):
             raise SchemaValidationError("{0} is not a string".format(obj))
-        if 'minLength' in self.schema and len(obj) < self.schema['minLength']:
+        if len(obj) < self._min_length:
             raise SchemaValidationError("{0} is shorter than minLength={1}"
-                                        "".format(obj, self.schema['minLength']))
-        if 'maxLength' in self.schema and len(obj) > self.schema['maxLength']:
+                                        "".format(obj, self._min_length))
+        if len(obj) > self._max_length:
             raise SchemaValidationError("{0} is longer than maxLength={1}"
-                                        "".format(obj, self.schema['maxLength']))
-        if 'pattern' in self.schema and not re.match(self.schema['pattern'], obj):
+                                        "".format(obj, self._max_length))
+        if self._pattern is not None and not self._pattern.match(obj):
             raise SchemaValidationError("{0} does not match pattern {1}"
                                         "".format(obj, self.schema['pattern']))
-        if 'format' in self.schema:
-            if self.schema['format'] not in self.valid_formats:
-                raise SchemaValidationError('format not recognized')
-            warnings.warn("format constraint not implemented in StringTypeValidator")
+        if self._format is not None and not self._format(obj):
+            raise SchemaValidationError("{0} is not of format {1}"
+                                        "".format(obj, self.schema['format']))
+        if self._unknown_format:
+            raise SchemaValidationError('format not recognized')
+
+    def matches(self, obj):
+        return (isinstance(obj, str)
+                and self._min_length <= len(obj) <= self._max_length
+                and (self._pattern is None
+                     or self._pattern.match(obj) is not None)
+                and (self._format is None or bool(self._format(obj)))
+                and not self._unknown_format)
+
+    def validate_many(self, values):
+        """Validate each item in a list of values
+
+        Types, lengths, pattern and format are checked for the whole list at
+        once, using set(map(type, ...)), min() and max() of the lengths, and
+        map() over the values with the compiled pattern and format check.
+        Items are only checked one at a time if this fails, to find the
+        offending value (or to accept values of str subclasses).
+        """
+        if (self._unknown_format
+                or not set(map(type, values)) <= _STRING_TYPES
+                or not _lengths_in_bounds(values, self)
+                or (self._pattern is not None
+                    and not all(map(self._pattern.match, values)))
+                or (self._format is not None
+                    and not all(map(self._format, values)))):
+            super(StringTypeValidator, self).validate_many(values)
 
 
 class NullTypeValidator(Validator):
-    recognized_keys = {'type'}
+    __slots__ = ()
+    recognized_keys = frozenset({'type'})
+    json_types = frozenset({type(None)})
     @classmethod
     def _matches(cls, schema):
         return schema.get('type', None) == 'null'
@@ -225,42 +591,120 @@ class NullTypeValidator(Validator):
         if obj is not None:
             raise SchemaValidationError()
 
+    def matches(self, obj):
+        return obj is None
+
 
 class BooleanTypeValidator(Validator):
-    recognized_keys = {'type', 'default'}
+    __slots__ = ()
+    recognized_keys = frozenset({'type', 'default'})
+    json_types = frozenset({bool})
     @classmethod
     def _matches(cls, schema):
         return schema.get('type', None) == 'boolean'
 
     def validate(self, obj):
-        if not isinstance(obj, bool):
+        if type(obj) is not bool:
             raise SchemaValidationError()
 
+    def matches(self, obj):
+        return type(obj) is bool
+
+
+# Validators whose checks depend only on the value itself
+_SCALAR_VALIDATORS = (NumberTypeValidator, IntegerTypeValidator,
+                      StringTypeValidator, NullTypeValidator,
+                      BooleanTypeValidator)
+
+
+# The Python types produced by json.load
+_JSON_TYPES = (dict, list, str, int, float, bool, type(None))
+
+
+def _branches_by_type(schemas):
+    """Map each JSON type to the schemas in a list which may accept it
+
+    A schema can only accept values of the types accepted by all of its
+    validators. Values of types not produced by json.load (e.g. subclasses)
+    are looked up under ``object``, which maps to all of the schemas.
+    """
+    table = {object: tuple(schemas)}
+    for typ in _JSON_TYPES:
+        table[typ] = tuple(schema for schema in schemas
+                           if all(v.json_types is None or typ in v.json_types
+                                  for v in schema.validators))
+    return table
+
+
+def _enum_key(value):
+    """Key for enum lookups: JSON distinguishes true from 1, Python does not
+
+    Lists and dicts are converted recursively (to tuples and frozensets), so
+    that the distinction also holds within them, e.g. [true] is not [1].
+    """
+    if isinstance(value, list):
+        return (list, tuple(map(_enum_key, value)))
+    if isinstance(value, dict):
+        return (dict, frozenset((key, _enum_key(val))
+                                for key, val in value.items()))
+    return (value.__class__ is bool, value)
+
 
 class EnumValidator(Validator):
-    recognized_keys = {'enum', 'default'}
+    __slots__ = ('_enum',)
+    recognized_keys = frozenset({'enum', 'default'})
     @classmethod
     def _matches(cls, schema):
         return 'enum' in schema
 
+    def __init__(self, schema, parent):
+        super(EnumValidator, self).__init__(schema, parent)
+        keys = [_enum_key(sys.intern(val) if isinstance(val, str) else val)
+                for val in schema['enum']]
+        try:
+            self._enum = frozenset(keys)
+        except TypeError:  # unhashable non-JSON values: use the list
+            self._enum = keys
+
     def validate(self, obj):
-        print(obj, self.schema['enum'], obj in self.schema['enum'])
-        if obj not in self.schema['enum']:
-            raise SchemaValidationError()
+        # Values of other types (e.g. Decimal, or subclasses of int) may
+        # compare equal to an enum value, but are not JSON values.
+        if obj.__class__ not in _JSON_TYPES:
+            valid = False
+        else:
+            try:
+                valid = _enum_key(obj) in self._enum
+            except TypeError:
+                # an unhashable obj can't equal any of the hashable values
+                valid = False
+        if not valid:
+            raise SchemaValidationError("{0} is not one of {1}"
+                                        "".format(obj, self.schema['enum']))
 
 
 class MultiTypeValidator(Validator):
-    recognized_keys = {'type', 'minimum', 'maximum'}
+    __slots__ = ('_typeschemas',)
+    recognized_keys = frozenset({'type', 'minimum', 'maximum'})
     @classmethod
     def _matches(cls, schema):
         return isinstance(schema.get('type', None), list)
 
+    def __init__(self, schema, parent):
+        super(MultiTypeValidator, self).__init__(schema, parent)
+        self._typeschemas = None
+
+    def _init_typeschemas(self):
+        # Build one single-type child per listed type on first use; creating
+        # fresh dicts each call would defeat the identity-based hash memo.
+        self._typeschemas = [self._init_child(dict(self.schema, type=typ))
+                             for typ in self.schema['type']]
+
     def validate(self, obj):
-        schema_copy = self.schema.copy()
-        for typ in self.schema['type']:
-            schema_copy['type'] = typ
+        if self._typeschemas is None:
+            self._init_typeschemas()
+        for child in self._typeschemas:
             try:
-                self._init_child(schema_copy).validate(obj)
+                child.validate(obj)
             except:
                 pass
             else:
@@ -269,7 +713,8 @@ class MultiTypeValidator(Validator):
 
 
 class RefValidator(Validator):
-    recognized_keys = {'$ref'}
+    __slots__ = ('_refschema', '_target')
+    recognized_keys = frozenset({'$ref'})
 
     @classmethod
     def _matches(cls, schema):
@@ -279,62 +724,82 @@ class RefValidator(Validator):
     def name(self):
         return self.schema['$ref']
 
+    def __init__(self, schema, parent):
+        super(RefValidator, self).__init__(schema, parent)
+        # Resolve the reference once, rather than re-walking the root
+        # schema every time the reference is followed.
+        self._refschema = parent.resolve_ref(schema['$ref'])
+        # The JSONSchema for the reference, created on first use: it cannot
+        # be created while the parent is still being built.
+        self._target = None
+
     @property
     def refschema(self):
-        keys = self.schema['$ref'].split('/')
-        if keys[0] != '#':
-            raise ValueError("$ref = {0} not recognized".format(self.schema['$ref']))
-        refschema = self.parent.root.schema
-        for key in keys[1:]:
-            refschema = refschema[key]
-        return refschema
+        return self._refschema
+
+    def _init_target(self):
+        self._target = self._init_child(self._refschema)
+        return self._target
 
     def __repr__(self):
         return "RefValidator('{0}')".format(self.name)
 
     def validate(self, obj):
-        self._init_child(self.refschema).validate(obj)
+        (self._target or self._init_target()).validate(obj)
+
+    def matches(self, obj):
+        return (self._target or self._init_target()).matches(obj)
 
 
 class AnyOfValidator(Validator):
-    recognized_keys = {'anyOf'}
+    __slots__ = ('_by_type',)
+    recognized_keys = frozenset({'anyOf'})
     @classmethod
     def _matches(cls, schema):
         return 'anyOf' in schema
 
+    def __init__(self, schema, parent):
+        super(AnyOfValidator, self).__init__(schema, parent)
+        self._by_type = None
+
     def validate(self, obj):
-        for child in self.schema['anyOf']:
-            print(child, obj)
-            try:
-                self._init_child(child).validate(obj)
-            except SchemaValidationError:
-                pass
-            else:
-                return
-        raise SchemaValidationError()
+        if self._by_type is None:
+            self._by_type = _branches_by_type(
+                [self._init_child(child) for child in self.schema['anyOf']])
+        branches = self._by_type.get(type(obj), None)
+        if branches is None:
+            branches = self._by_type[object]
+        if not any(child.matches(obj) for child in branches):
+            raise SchemaValidationError()
 
 
 class OneOfValidator(Validator):
-    recognized_keys = {'oneOf'}
+    __slots__ = ('_by_type',)
+    recognized_keys = frozenset({'oneOf'})
     @classmethod
     def _matches(cls, schema):
         return 'oneOf' in schema
 
+    def __init__(self, schema, parent):
+        super(OneOfValidator, self).__init__(schema, parent)
+        self._by_type = None
+
     def validate(self, obj):
-        count = 0
-        for child in self.schema['oneOf']:
-            try:
-                self._init_child(child).validate(obj)
-            except:
-                pass
-            else:
-                count += 1
+        if self._by_type is None:
+            self._by_type = _branches_by_type(
+                [self._init_child(child) for child in self.schema['oneOf']])
+        branches = self._by_type.get(type(obj), None)
+        if branches is None:
+            branches = self._by_type[object]
+        # Branches which cannot accept obj's type would not match anyway.
+        count = sum(child.matches(obj) for child in branches)
         if count != 1:
             raise SchemaValidationError()
 
 
 class AllOfValidator(Validator):
-    recognized_keys = {'allOf'}
+    __slots__ = ()
+    recognized_keys = frozenset({'allOf'})
     @classmethod
     def _matches(cls, schema):
         return 'allOf' in schema
@@ -345,7 +810,8 @@ class AllOfValidator(Validator):
 
 
 class NotValidator(Validator):
-    recognized_keys = {'not'}
+    __slots__ = ()
+    recognized_keys = frozenset({'not'})
     @classmethod
     def _matches(cls, schema):
         return 'not' in schema
@@ -357,3 +823,47 @@ class NotValidator(Validator):
             pass
         else:
             raise SchemaValidationError()
+
+
+# Dispatch tables mapping schemas to the validator classes which apply to them.
+# These mirror the ``_matches`` classmethods, but let us find the matching
+# classes with one or two dict lookups rather than testing every subclass.
+_TYPE_DISPATCH = {'object': ObjectValidator,
+                  'array': ArrayValidator,
+                  'number': NumberTypeValidator,
+                  'integer': IntegerTypeValidator,
+                  'string': StringTypeValidator,
+                  'null': NullTypeValidator,
+                  'boolean': BooleanTypeValidator}
+
+_KEY_TRIGGERS = {'properties': ObjectValidator,
+                 'patternProperties': ObjectValidator,
+                 'additionalProperties': ObjectValidator,
+                 'items': ArrayValidator,
+                 'enum': EnumValidator,
+                 '$ref': RefValidator,
+                 'anyOf': AnyOfValidator,
+                 'oneOf': OneOfValidator,
+                 'allOf': AllOfValidator,
+                 'not': NotValidator}
+
+
+def _matching_classes(schema):
+    """Return the list of Validator classes which apply to a schema dict"""
+    typ = schema.get('type', None)
+    if isinstance(typ, list):
+        classes = [MultiTypeValidator]
+    elif typ in _TYPE_DISPATCH:
+        classes = [_TYPE_DISPATCH[typ]]
+    else:
+        classes = []
+    # Schemas have few keys, so one pass over them is cheaper than probing
+    # the schema for every trigger key.
+    for key in schema:
+        cls = _KEY_TRIGGERS.get(key, None)
+        if cls is not None and cls not in classes:
+            classes.append(cls)
+    for cls in _EXTENSION_CLASSES:
+        if cls._matches(schema):
+            classes.append(cls)
+    return classes